@@ -40,6 +40,7 @@ execution_status = {
 # Global variables for schedule data
 current_schedule = None
 initial_schedule = None
+stabling_plan = None
 modification_log = []
 fleet_analytics = None
 
@@ -210,7 +211,14 @@ def predict_status(data):
 def generate_initial_schedule(data):
     """Generate initial optimized schedule using MetroX_309 logic"""
     global fleet_analytics
-    
+
+    final_schedule, fleet_analytics = build_schedule(data)
+    return final_schedule
+
+def build_schedule(data):
+    """Build an optimized schedule, returning it with the fleet analytics it used"""
+    analytics = None
+
     # Make predictions
     data['predicted_failure_risk'] = predict_failure_risk(data)
     data['predicted_next_day_mileage'] = predict_next_day_mileage(data)
@@ -234,8 +242,8 @@ def generate_initial_schedule(data):
 
     # Get fleet allocation targets but CAP Service at 14
     if MetroFleetAnalytics:
-        fleet_analytics = MetroFleetAnalytics(data)
-        fa = fleet_analytics.fleet_allocation_justification()
+        analytics = MetroFleetAnalytics(data)
+        fa = analytics.fleet_allocation_justification()
         TARGET_SERVICE_COUNT = min(fa['min_service_trains'], len(eligible_trains))
     else:
         TARGET_SERVICE_COUNT = min(14, len(eligible_trains))
@@ -276,7 +284,263 @@ def generate_initial_schedule(data):
     final_schedule = final_schedule.sort_values(by='final_status', key=lambda x: x.map({'Service':0,'Standby':1,'IBL':2})).reset_index(drop=True)
     final_schedule['ranking'] = final_schedule.index + 1
 
-    return final_schedule
+    return final_schedule, analytics
+
+# Depot stabling layout: each bay is a dead-end siding holding trains nose to tail,
+# with slot 1 at the exit end
+NUM_STABLING_BAYS = 15
+BAY_CAPACITY = 2
+BLOCKED_MOVE_MINS = 10
+EXACT_MAX_TRAINS = 20
+# Search nodes the exact search may visit before settling for its best assignment so far
+EXACT_NODE_BUDGET = 100000
+
+# Morning departure groups: Service leaves first, then Standby; IBL trains stay in the depot
+DEPARTURE_GROUPS = {'Service': 0, 'Standby': 1, 'IBL': 2}
+
+def _departure_sequence(depot_trains, slots):
+    """Morning departure order for a depot's Service and Standby trains
+
+    Departures are free to be reordered within Service and within Standby, so
+    each group leaves in ranking order except where a train stabled in front of
+    it in the same bay has to leave first.
+    """
+    sequence = []
+    for status in ('Service', 'Standby'):
+        pending = depot_trains[depot_trains['final_status'] == status].sort_values(by='ranking')['train_id'].tolist()
+        while pending:
+            for train in pending:
+                bay, slot = slots[train]
+                if not any(slots[other][0] == bay and slots[other][1] < slot for other in pending):
+                    break
+            pending.remove(train)
+            sequence.append(train)
+    return sequence
+
+def _placement_cost(train, bay, occupants, trains):
+    """Extra shunting minutes and blocked-in moves from placing train in a bay
+
+    A train already in its bay stays at the rear; trains shunted in are placed in
+    front of it, and any of them in a later departure group blocks it in. Trains
+    in the same group never block each other since their departures can be
+    reordered. The existing order of trains already sharing a bay is not
+    recorded, so two of them in different groups count as one blocked move.
+    """
+    if trains[train]['current_bay'] == bay:
+        blocked = sum(1 for other in occupants
+                      if trains[other]['current_bay'] != bay and trains[other]['group'] > trains[train]['group'])
+        blocked += sum(1 for other in occupants
+                       if trains[other]['current_bay'] == bay and trains[other]['group'] != trains[train]['group'])
+        return blocked * BLOCKED_MOVE_MINS, blocked
+    blocked = sum(1 for other in occupants
+                  if trains[other]['current_bay'] == bay and trains[other]['group'] < trains[train]['group'])
+    return trains[train]['shunting_mins'] + blocked * BLOCKED_MOVE_MINS, blocked
+
+def _total_stabling_cost(assignment, trains):
+    """Total shunting minutes and blocked-in moves of a bay assignment"""
+    bays = {}
+    for train, bay in assignment.items():
+        bays.setdefault(bay, []).append(train)
+
+    total_mins, total_blocked = 0, 0
+    for bay, occupants in bays.items():
+        placed = []
+        for train in occupants:
+            mins, blocked = _placement_cost(train, bay, placed, trains)
+            total_mins += mins
+            total_blocked += blocked
+            placed.append(train)
+    return total_mins, total_blocked
+
+def _heuristic_stabling(trains, bays):
+    """Greedy bay assignment followed by single-train relocation improvements"""
+    occupancy = {bay: [] for bay in bays}
+    assignment = {}
+
+    # Keep trains in their current bay where possible, biggest shunt saving first
+    for train in sorted(trains, key=lambda t: -trains[t]['shunting_mins']):
+        bay = trains[train]['current_bay']
+        if bay in occupancy and len(occupancy[bay]) < BAY_CAPACITY:
+            occupancy[bay].append(train)
+            assignment[train] = bay
+
+    # Place the rest, latest departures first, where they block the fewest trains
+    for train in sorted((t for t in trains if t not in assignment), key=lambda t: -trains[t]['group']):
+        open_bays = [bay for bay in bays if len(occupancy[bay]) < BAY_CAPACITY]
+        bay = min(open_bays, key=lambda b: (_placement_cost(train, b, occupancy[b], trains)[0], len(occupancy[b]) == 0))
+        occupancy[bay].append(train)
+        assignment[train] = bay
+
+    best_mins = _total_stabling_cost(assignment, trains)[0]
+    improved = True
+    while improved:
+        improved = False
+        for train in trains:
+            current = assignment[train]
+            for bay in bays:
+                if bay == current or len(occupancy[bay]) >= BAY_CAPACITY:
+                    continue
+                assignment[train] = bay
+                mins = _total_stabling_cost(assignment, trains)[0]
+                if mins < best_mins:
+                    occupancy[current].remove(train)
+                    occupancy[bay].append(train)
+                    best_mins, current, improved = mins, bay, True
+                else:
+                    assignment[train] = current
+    return assignment
+
+def _forced_moves_bound(remaining, occupancy, trains):
+    """Lower bound on shunting minutes for trains whose current bay cannot hold them all"""
+    claims = {}
+    for train in remaining:
+        claims.setdefault(trains[train]['current_bay'], []).append(trains[train]['shunting_mins'])
+
+    bound = 0
+    for bay, shunting_mins in claims.items():
+        free_slots = BAY_CAPACITY - len(occupancy[bay]) if bay in occupancy else 0
+        excess = len(shunting_mins) - free_slots
+        if excess > 0:
+            bound += sum(sorted(shunting_mins)[:excess])
+    return bound
+
+def _exact_stabling(trains, bays, initial_assignment, node_budget=None):
+    """Branch-and-bound search for the minimum-shunting bay assignment
+
+    Gives up after node_budget search nodes (EXACT_NODE_BUDGET by default).
+    Returns the best assignment found and whether it is proven optimal.
+    """
+    if node_budget is None:
+        node_budget = EXACT_NODE_BUDGET
+
+    # Trains competing for the same bay are decided together so the bound tightens early
+    order = sorted(trains, key=lambda t: (trains[t]['current_bay'], trains[t]['group']))
+    claimed_bays = {trains[t]['current_bay'] for t in trains}
+    occupancy = {bay: [] for bay in bays}
+    assignment = {}
+    best = {'mins': _total_stabling_cost(initial_assignment, trains)[0], 'assignment': initial_assignment}
+    nodes = {'visited': 0}
+
+    def search(index, mins):
+        nodes['visited'] += 1
+        if nodes['visited'] > node_budget:
+            return
+        if mins + _forced_moves_bound(order[index:], occupancy, trains) >= best['mins']:
+            return
+        if index == len(order):
+            best['mins'], best['assignment'] = mins, dict(assignment)
+            return
+
+        train = order[index]
+        # Bays no train is stabled in only ever hold shunted-in trains, which never
+        # block each other, so they are interchangeable and only the first open one is tried
+        candidates, spare_bay_tried = [], False
+        for bay in bays:
+            if len(occupancy[bay]) >= BAY_CAPACITY:
+                continue
+            if bay not in claimed_bays:
+                if spare_bay_tried:
+                    continue
+                spare_bay_tried = True
+            candidates.append(bay)
+
+        # Staying put is usually cheapest, then a spare bay, so try those first to tighten the bound
+        candidates.sort(key=lambda b: (b != trains[train]['current_bay'], b in claimed_bays))
+        for bay in candidates:
+            cost = _placement_cost(train, bay, occupancy[bay], trains)[0]
+            occupancy[bay].append(train)
+            assignment[train] = bay
+            search(index + 1, mins + cost)
+            occupancy[bay].pop()
+            del assignment[train]
+
+    search(0, 0)
+    return best['assignment'], nodes['visited'] <= node_budget
+
+def assign_stabling_bays(schedule, mode='auto'):
+    """Assign depot bays and a morning departure sequence for a final schedule
+
+    Service trains leave before Standby trains, but departures within each group
+    are reordered around the bay layout so they don't block each other. mode is
+    'heuristic', 'exact' or 'auto' (exact for depots of up to EXACT_MAX_TRAINS
+    trains). A depot whose exact search runs out of EXACT_NODE_BUDGET is
+    reported as 'heuristic'. Returns the schedule with assigned_bay, bay_slot and
+    departure_order columns, plus a summary per depot. bay_slot is None for
+    trains staying in a bay alongside a train of another group, since their
+    existing order is unknown.
+    """
+    if mode not in ('auto', 'heuristic', 'exact'):
+        raise ValueError(f"Unknown stabling mode: {mode}")
+
+    bays = [f"Bay-{i}" for i in range(1, NUM_STABLING_BAYS + 1)]
+    stabled = schedule.copy()
+    stabled['assigned_bay'] = None
+    stabled['bay_slot'] = None
+    stabled['departure_order'] = None
+    depot_summary = []
+
+    for depot, depot_trains in stabled.groupby('depot'):
+        if len(depot_trains) > len(bays) * BAY_CAPACITY:
+            raise ValueError(f"{depot} has more trains than stabling slots")
+
+        start = time.perf_counter()
+        trains = {
+            row['train_id']: {
+                'current_bay': row['stabling_position'],
+                'shunting_mins': int(row['estimated_shunting_mins']),
+                'group': DEPARTURE_GROUPS[row['final_status']],
+                'ranking': row['ranking']
+            }
+            for _, row in depot_trains.iterrows()
+        }
+
+        if mode == 'exact' and len(trains) > EXACT_MAX_TRAINS:
+            raise ValueError(f"{depot} has {len(trains)} trains; exact mode supports up to {EXACT_MAX_TRAINS}")
+
+        # The heuristic result seeds the exact search as its upper bound
+        assignment = _heuristic_stabling(trains, bays)
+        used_mode = 'heuristic'
+        if mode != 'heuristic' and len(trains) <= EXACT_MAX_TRAINS:
+            assignment, solved = _exact_stabling(trains, bays, assignment)
+            if solved:
+                used_mode = 'exact'
+        total_mins, blocked_moves = _total_stabling_cost(assignment, trains)
+
+        # Within a bay, shunted-in trains sit in front of the trains already there
+        slots = {}
+        unknown_slots = set()
+        for bay in bays:
+            occupants = sorted(
+                (t for t, b in assignment.items() if b == bay),
+                key=lambda t: (trains[t]['current_bay'] == bay, trains[t]['group'], trains[t]['ranking'])
+            )
+            for slot, train in enumerate(occupants, start=1):
+                slots[train] = (bay, slot)
+            # The existing order of trains staying in a bay is not recorded; when they are
+            # in different groups it is costed as a blocked move, so no slot is claimed
+            stayers = [t for t in occupants if trains[t]['current_bay'] == bay]
+            if len({trains[t]['group'] for t in stayers}) > 1:
+                unknown_slots.update(stayers)
+        sequence = _departure_sequence(depot_trains, slots)
+        solve_time_ms = (time.perf_counter() - start) * 1000
+
+        for train, (bay, slot) in slots.items():
+            bay_slot = None if train in unknown_slots else slot
+            stabled.loc[stabled['train_id'] == train, ['assigned_bay', 'bay_slot']] = [bay, bay_slot]
+        for order, train in enumerate(sequence, start=1):
+            stabled.loc[stabled['train_id'] == train, 'departure_order'] = order
+
+        depot_summary.append({
+            'depot': depot,
+            'mode': used_mode,
+            'trains': len(trains),
+            'moved_trains': sum(1 for t, b in assignment.items() if trains[t]['current_bay'] != b),
+            'blocked_moves': blocked_moves,
+            'total_shunting_mins': total_mins,
+            'solve_time_ms': round(solve_time_ms, 2)
+        })
+
+    return stabled, depot_summary
 
 def generate_alerts(schedule_data):
     """Generate alerts using MetroX_309 analytics"""
@@ -313,7 +577,7 @@ def generate_alerts(schedule_data):
 
 def run_simulation():
     """Run the simulation and generate schedule"""
-    global current_schedule, initial_schedule, execution_status, modification_log
+    global current_schedule, initial_schedule, stabling_plan, execution_status, modification_log
     
     try:
         execution_status['is_running'] = True
@@ -321,6 +585,7 @@ def run_simulation():
         execution_status['error'] = None
         execution_status['last_execution'] = datetime.now().isoformat()
         modification_log = []
+        stabling_plan = None
         
         execution_status['current_step'] = 'Data Simulation'
         execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] Starting data simulation...")
@@ -345,6 +610,13 @@ def run_simulation():
         
         execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Schedule generated successfully")
         execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] 📊 SUMMARY: {service_count} Service, {standby_count} Standby, {ibl_count} IBL")
+
+        # Plan depot stabling for the generated schedule
+        execution_status['current_step'] = 'Stabling Assignment'
+        stabling_plan = assign_stabling_bays(current_schedule)
+        _, depot_summary = stabling_plan
+        for depot in depot_summary:
+            execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] 🅿️ {depot['depot']}: {depot['total_shunting_mins']} shunting mins, {depot['blocked_moves']} blocked-in moves ({depot['mode']}, {depot['solve_time_ms']} ms)")
         
         # Save to Supabase if available
         if supabase:
@@ -374,6 +646,173 @@ def execute_pipeline():
     thread.daemon = True
     thread.start()
 
+# Per-train columns carried forward from one simulated day to the next
+TRAIN_STATE_COLUMNS = [
+    'train_id', 'mileage_km', 'bogie_wear_index',
+    'rs_days_from_plan', 'sig_days_from_plan', 'tel_days_from_plan',
+    'last_maintenance_date'
+]
+
+PLAN_COLUMNS = ['rs_days_from_plan', 'sig_days_from_plan', 'tel_days_from_plan']
+
+# Days until the next planned check once an overdue one has been carried out
+PLAN_RESET_DAYS = (30, 90)
+
+BACKFILL_DIR = os.path.join(os.path.dirname(__file__), 'backfill')
+BACKFILL_CHECKPOINT = 'checkpoint.json'
+
+def extract_train_state(day_data):
+    """Reduce a day's schedule to the per-train state needed to simulate the next day
+
+    Trains held in IBL with an overdue plan are maintained overnight, so their
+    overdue plans restart and last_maintenance_date moves to that day.
+    """
+    train_state = day_data[TRAIN_STATE_COLUMNS].drop_duplicates('train_id').reset_index(drop=True)
+    if 'final_status' not in day_data:
+        return train_state
+
+    ibl_trains = day_data.loc[day_data['final_status'] == 'IBL', 'train_id']
+    in_ibl = train_state['train_id'].isin(ibl_trains)
+    maintained = in_ibl & (train_state[PLAN_COLUMNS] <= 0).any(axis=1)
+    train_state.loc[maintained, 'last_maintenance_date'] = day_data['date'].iloc[0]
+    for column in PLAN_COLUMNS:
+        overdue = in_ibl & (train_state[column] <= 0)
+        train_state.loc[overdue, column] = np.random.randint(*PLAN_RESET_DAYS, size=overdue.sum())
+    return train_state
+
+def backfill_run_info(start_date, end_date, chunk_days, sink_name):
+    """Describe a backfill run so a checkpoint can only resume the run it came from"""
+    return {
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'chunk_days': chunk_days,
+        'sink': sink_name
+    }
+
+def save_backfill_checkpoint(path, next_date, train_state, run_info=None):
+    """Save backfill progress so an interrupted run can be resumed"""
+    checkpoint = {
+        'run': run_info,
+        'next_date': next_date.strftime('%Y-%m-%d'),
+        'train_state': json.loads(train_state.to_json(orient='records'))
+    }
+    # Write to a temp file first so a crash never leaves a half-written checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def load_backfill_checkpoint(path, run_info=None):
+    """Load the next date and train state saved by save_backfill_checkpoint
+
+    When run_info is given, raises ValueError if the checkpoint belongs to a
+    different run.
+    """
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if run_info is not None and checkpoint.get('run') != run_info:
+        raise ValueError('Checkpoint belongs to a different backfill run')
+    next_date = datetime.strptime(checkpoint['next_date'], '%Y-%m-%d').date()
+    train_state = pd.DataFrame(checkpoint['train_state'], columns=TRAIN_STATE_COLUMNS)
+    return next_date, train_state
+
+def file_sink(output_dir):
+    """Sink that writes each backfill chunk to its own CSV file"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    def write_chunk(chunk):
+        first_date = chunk['date'].iloc[0]
+        last_date = chunk['date'].iloc[-1]
+        chunk.to_csv(os.path.join(output_dir, f"schedule_{first_date}_{last_date}.csv"), index=False)
+
+    return write_chunk
+
+def supabase_sink(table="daily_data"):
+    """Sink that replaces each backfill chunk's dates in a Supabase table"""
+    if not supabase:
+        raise RuntimeError('Supabase is not connected')
+
+    def write_chunk(chunk):
+        dates = chunk['date'].unique().tolist()
+        supabase.table(table).delete().in_("date", dates).execute()
+        records = chunk.drop(columns=['ranking'], errors='ignore').to_dict('records')
+        supabase.table(table).insert(records).execute()
+
+    return write_chunk
+
+def backfill_schedules(start_date, end_date, chunk_days=7, sink=None, train_state=None, checkpoint_path=None, run_info=None):
+    """Simulate and schedule every day from start_date to end_date, yielding chunks of chunk_days days
+
+    Only the per-train state is carried between days, so memory use stays
+    constant however long the range is. Pass the train_state from
+    load_backfill_checkpoint to resume an interrupted run; run_info is stored
+    in each checkpoint to tie it to this run.
+    """
+    if chunk_days < 1:
+        raise ValueError('chunk_days must be at least 1')
+
+    sim_date = start_date
+    while sim_date <= end_date:
+        chunk_end = min(sim_date + timedelta(days=chunk_days - 1), end_date)
+        day_schedules = []
+        while sim_date <= chunk_end:
+            day_data = simulate_data_for_day(sim_date, train_state)
+            # Leave the live schedule's fleet analytics untouched
+            schedule, _ = build_schedule(day_data)
+            train_state = extract_train_state(schedule)
+            day_schedules.append(schedule)
+            sim_date += timedelta(days=1)
+
+        chunk = pd.concat(day_schedules, ignore_index=True)
+        del day_schedules
+
+        if sink is not None:
+            sink(chunk)
+        if checkpoint_path:
+            save_backfill_checkpoint(checkpoint_path, sim_date, train_state, run_info)
+
+        yield chunk
+
+def run_backfill(start_date, end_date, chunk_days, sink_name, output_dir, resume):
+    """Run a multi-day backfill and report progress through execution_status"""
+    global execution_status
+
+    try:
+        execution_status['is_running'] = True
+        execution_status['output'] = []
+        execution_status['error'] = None
+        execution_status['last_execution'] = datetime.now().isoformat()
+        execution_status['current_step'] = 'Backfill'
+
+        os.makedirs(output_dir, exist_ok=True)
+        checkpoint_path = os.path.join(output_dir, BACKFILL_CHECKPOINT)
+        run_info = backfill_run_info(start_date, end_date, chunk_days, sink_name)
+
+        train_state = None
+        if resume and os.path.exists(checkpoint_path):
+            start_date, train_state = load_backfill_checkpoint(checkpoint_path, run_info)
+            execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] Resuming backfill from {start_date}")
+
+        sink = supabase_sink() if sink_name == 'supabase' else file_sink(output_dir)
+
+        execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] Backfilling {start_date} to {end_date} in {chunk_days}-day chunks...")
+
+        for chunk in backfill_schedules(start_date, end_date, chunk_days, sink, train_state, checkpoint_path, run_info):
+            service_count = len(chunk[chunk['final_status'] == 'Service'])
+            execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {chunk['date'].iloc[0]} to {chunk['date'].iloc[-1]}: {len(chunk)} records, {service_count} Service assignments")
+
+        # A finished run has nothing left to resume
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] 🎉 Backfill completed successfully!")
+
+    except Exception as e:
+        execution_status['error'] = f"Backfill error: {str(e)}"
+        execution_status['output'].append(f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Backfill error: {str(e)}")
+    finally:
+        execution_status['is_running'] = False
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get current execution status"""
@@ -390,6 +829,47 @@ def predict():
     execute_pipeline()
     return jsonify({'message': 'Pipeline started'})
 
+@app.route('/api/backfill', methods=['POST'])
+def backfill():
+    """Start a streaming multi-day backfill"""
+    global execution_status
+
+    if execution_status['is_running']:
+        return jsonify({'error': 'Pipeline is already running'}), 400
+
+    data = request.get_json() or {}
+    sink_name = data.get('sink', 'file')
+
+    try:
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+        chunk_days = int(data.get('chunk_days', 7))
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'start_date and end_date (YYYY-MM-DD) are required'}), 400
+
+    if end_date < start_date or chunk_days < 1:
+        return jsonify({'error': 'Invalid date range or chunk size'}), 400
+    if sink_name not in ('file', 'supabase'):
+        return jsonify({'error': 'Invalid sink'}), 400
+    if sink_name == 'supabase' and not supabase:
+        return jsonify({'error': 'Supabase is not connected'}), 400
+
+    resume = bool(data.get('resume', False))
+    checkpoint_path = os.path.join(BACKFILL_DIR, BACKFILL_CHECKPOINT)
+    if resume and os.path.exists(checkpoint_path):
+        try:
+            load_backfill_checkpoint(checkpoint_path, backfill_run_info(start_date, end_date, chunk_days, sink_name))
+        except ValueError as e:
+            return jsonify({'error': f'Cannot resume: {str(e)}'}), 400
+
+    thread = threading.Thread(
+        target=run_backfill,
+        args=(start_date, end_date, chunk_days, sink_name, BACKFILL_DIR, resume)
+    )
+    thread.daemon = True
+    thread.start()
+    return jsonify({'message': 'Backfill started'})
+
 @app.route('/api/schedule', methods=['GET'])
 def get_schedule():
     """Get current schedule"""
@@ -402,7 +882,7 @@ def get_schedule():
 @app.route('/api/modify', methods=['POST'])
 def modify_schedule():
     """Modify the schedule"""
-    global current_schedule, modification_log
+    global current_schedule, stabling_plan, modification_log
     
     data = request.get_json()
     action = data.get('action')
@@ -438,6 +918,7 @@ def modify_schedule():
             current_schedule.loc[current_schedule['train_id'] == train_id, 'final_status'] = 'Service'
             current_schedule.loc[current_schedule['train_id'] == train_id, 'manual_override_flag'] = 1
             modification_log.append(f"🚆 {train_id}: {original_status} → Service (Manual override)")
+            stabling_plan = None
             
             # Generate alerts for this modification
             system_alerts = generate_alerts(current_schedule)
@@ -468,6 +949,7 @@ def modify_schedule():
             current_schedule.loc[current_schedule['train_id'] == train_id, 'final_status'] = 'Standby'
             current_schedule.loc[current_schedule['train_id'] == train_id, 'manual_override_flag'] = 1
             modification_log.append(f"🚆 {train_id}: {original_status} → Standby (Manual override)")
+            stabling_plan = None
             
             # Generate alerts for this modification
             system_alerts = generate_alerts(current_schedule)
@@ -491,6 +973,7 @@ def modify_schedule():
             current_schedule.loc[current_schedule['train_id'] == train_id, 'final_status'] = 'IBL'
             current_schedule.loc[current_schedule['train_id'] == train_id, 'manual_override_flag'] = 1
             modification_log.append(f"🚆 {train_id}: {original_status} → IBL (Manual override)")
+            stabling_plan = None
             
             # Generate alerts for this modification
             system_alerts = generate_alerts(current_schedule)
@@ -516,6 +999,7 @@ def modify_schedule():
             current_schedule.loc[current_schedule['train_id'] == train_id, 'final_status'] = predicted_status
             current_schedule.loc[current_schedule['train_id'] == train_id, 'manual_override_flag'] = 0
             modification_log.append(f"🚆 {train_id}: {original_status} → {predicted_status} (Reset)")
+            stabling_plan = None
             
             # Generate alerts for this modification
             system_alerts = generate_alerts(current_schedule)
@@ -659,6 +1143,28 @@ def get_alerts():
     else:
         return jsonify({'alerts': []})
 
+@app.route('/api/stabling', methods=['GET'])
+def get_stabling_plan():
+    """Get depot bay assignments and morning departure sequence"""
+    global current_schedule, stabling_plan
+    if current_schedule is None:
+        return jsonify({'error': 'No schedule available'}), 404
+
+    # The default plan is kept until the schedule changes; other modes are solved on request
+    mode = request.args.get('mode', 'auto')
+    if mode == 'auto' and stabling_plan is not None:
+        stabled, depot_summary = stabling_plan
+    else:
+        try:
+            stabled, depot_summary = assign_stabling_bays(current_schedule, mode)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if mode == 'auto':
+            stabling_plan = (stabled, depot_summary)
+
+    columns = ['train_id', 'depot', 'final_status', 'stabling_position', 'assigned_bay', 'bay_slot', 'departure_order']
+    return jsonify({'depots': depot_summary, 'assignments': stabled[columns].to_dict('records')})
+
 @app.route('/api/fleet-analytics', methods=['GET'])
 def get_fleet_analytics():
     """Get KMRL Fleet Analytics Report"""
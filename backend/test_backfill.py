@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+import app
+
+
+class BackfillTest(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        app.execution_status.update({
+            'is_running': False,
+            'current_step': '',
+            'output': [],
+            'error': None,
+            'last_execution': None
+        })
+
+    def make_output_dir(self):
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        return output_dir.name
+
+    def test_service_continues_over_several_months(self):
+        chunks = app.backfill_schedules(date(2024, 1, 1), date(2024, 6, 30), chunk_days=30)
+        for chunk in chunks:
+            service_count = (chunk['final_status'] == 'Service').sum()
+            self.assertGreater(service_count, 0, f"No Service trains from {chunk['date'].iloc[0]}")
+
+    def test_overdue_ibl_trains_are_maintained(self):
+        schedule, _ = app.build_schedule(app.simulate_data_for_day(date(2024, 1, 1)))
+        schedule.loc[0, ['rs_days_from_plan', 'final_status']] = [-1, 'IBL']
+        train_state = app.extract_train_state(schedule)
+        maintained = train_state[train_state['train_id'] == schedule.loc[0, 'train_id']].iloc[0]
+        self.assertGreater(maintained['rs_days_from_plan'], 0)
+        self.assertEqual(maintained['last_maintenance_date'], '2024-01-01')
+
+    def test_finished_run_removes_checkpoint(self):
+        output_dir = self.make_output_dir()
+        app.run_backfill(date(2024, 1, 1), date(2024, 1, 10), 5, 'file', output_dir, False)
+        self.assertIsNone(app.execution_status['error'])
+        self.assertFalse(os.path.exists(os.path.join(output_dir, app.BACKFILL_CHECKPOINT)))
+
+    def test_resume_rejects_checkpoint_from_another_run(self):
+        output_dir = self.make_output_dir()
+        checkpoint_path = os.path.join(output_dir, app.BACKFILL_CHECKPOINT)
+        chunks = app.backfill_schedules(
+            date(2024, 1, 1), date(2024, 1, 10), 5, checkpoint_path=checkpoint_path,
+            run_info=app.backfill_run_info(date(2024, 1, 1), date(2024, 1, 10), 5, 'file')
+        )
+        next(chunks)
+
+        app.run_backfill(date(2024, 6, 1), date(2024, 6, 10), 5, 'file', output_dir, True)
+        self.assertIn('different backfill run', app.execution_status['error'])
+
+        app.run_backfill(date(2024, 1, 1), date(2024, 1, 10), 5, 'file', output_dir, True)
+        self.assertIsNone(app.execution_status['error'])
+        self.assertIn('Resuming backfill from 2024-01-06', app.execution_status['output'][0])
+        self.assertFalse(os.path.exists(os.path.join(output_dir, 'schedule_2024-01-01_2024-01-05.csv')))
+
+
+if __name__ == '__main__':
+    unittest.main()
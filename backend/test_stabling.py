@@ -0,0 +1,106 @@
+import itertools
+import unittest
+from datetime import date
+
+import numpy as np
+
+import app
+
+
+BAYS = [f"Bay-{i}" for i in range(1, app.NUM_STABLING_BAYS + 1)]
+
+
+def make_schedule(seed):
+    np.random.seed(seed)
+    schedule, _ = app.build_schedule(app.simulate_data_for_day(date(2024, 1, 1)))
+    return schedule
+
+
+def make_trains(seed, count, claimed_bays):
+    """Small depot whose trains are all currently stabled in the first claimed_bays bays"""
+    rng = np.random.RandomState(seed)
+    statuses = list(app.DEPARTURE_GROUPS)
+    return {
+        f"KM-T{101 + i}": {
+            'current_bay': BAYS[rng.randint(claimed_bays)],
+            'shunting_mins': int(rng.randint(15, 45)),
+            'group': app.DEPARTURE_GROUPS[statuses[rng.randint(len(statuses))]],
+            'ranking': i + 1
+        }
+        for i in range(count)
+    }
+
+
+def brute_force_mins(trains, bays):
+    train_ids = list(trains)
+    best = None
+    for combo in itertools.product(bays, repeat=len(train_ids)):
+        if any(combo.count(bay) > app.BAY_CAPACITY for bay in bays):
+            continue
+        mins = app._total_stabling_cost(dict(zip(train_ids, combo)), trains)[0]
+        if best is None or mins < best:
+            best = mins
+    return best
+
+
+class ExactStablingTest(unittest.TestCase):
+    def test_exact_matches_brute_force(self):
+        # Empty bays are interchangeable, so enough of them to take every train is sufficient
+        for seed in range(20):
+            trains = make_trains(seed, 5, 3)
+            exact, solved = app._exact_stabling(trains, BAYS, app._heuristic_stabling(trains, BAYS))
+            self.assertTrue(solved)
+            self.assertEqual(app._total_stabling_cost(exact, trains)[0], brute_force_mins(trains, BAYS[:6]))
+
+    def test_heuristic_never_beats_exact(self):
+        for seed in range(20):
+            trains = make_trains(seed, 10, 4)
+            heuristic = app._heuristic_stabling(trains, BAYS)
+            exact, _ = app._exact_stabling(trains, BAYS, heuristic)
+            self.assertGreaterEqual(
+                app._total_stabling_cost(heuristic, trains)[0],
+                app._total_stabling_cost(exact, trains)[0]
+            )
+
+
+class AssignStablingBaysTest(unittest.TestCase):
+    def test_departures_respect_bay_order(self):
+        schedule = make_schedule(0).iloc[:3].copy()
+        schedule['depot'] = 'Pettah Depot'
+        schedule['final_status'] = 'Service'
+        schedule['ranking'] = [1, 2, 3]
+        train_ids = schedule['train_id'].tolist()
+        slots = {train_ids[0]: ('Bay-1', 2), train_ids[1]: ('Bay-1', 1), train_ids[2]: ('Bay-2', 1)}
+        self.assertEqual(app._departure_sequence(schedule, slots), [train_ids[1], train_ids[0], train_ids[2]])
+
+        for seed in range(10):
+            stabled, _ = app.assign_stabling_bays(make_schedule(seed))
+            slotted = stabled[stabled['bay_slot'].notna() & stabled['departure_order'].notna()]
+            for _, group in slotted.groupby(['depot', 'assigned_bay', 'final_status']):
+                group = group.sort_values(by='bay_slot')
+                self.assertTrue(group['departure_order'].is_monotonic_increasing)
+
+    def test_no_bay_over_capacity(self):
+        for seed in range(10):
+            schedule = make_schedule(seed)
+            # Crowd every train into a few bays so some have to be shunted elsewhere
+            schedule['stabling_position'] = [BAYS[i % 3] for i in range(len(schedule))]
+            for mode in ('auto', 'heuristic'):
+                stabled, _ = app.assign_stabling_bays(schedule, mode)
+                self.assertTrue(stabled['assigned_bay'].notna().all())
+                self.assertLessEqual(stabled.groupby(['depot', 'assigned_bay']).size().max(), app.BAY_CAPACITY)
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            app.assign_stabling_bays(make_schedule(0), 'fastest')
+
+    def test_exact_mode_rejects_large_depot(self):
+        schedule = make_schedule(0)
+        schedule['depot'] = 'Pettah Depot'
+        self.assertGreater(len(schedule), app.EXACT_MAX_TRAINS)
+        with self.assertRaises(ValueError):
+            app.assign_stabling_bays(schedule, 'exact')
+
+
+if __name__ == '__main__':
+    unittest.main()